@@ -1,26 +1,83 @@
 import os
 import sys
-import json
+import re
+import hashlib
+import pickle
+import queue
+import asyncio
+import threading
+from functools import partial
+import orjson
 import google.generativeai as genai
-from PyQt5.QtCore import QThread, pyqtSignal, QTimer, Qt
-from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QTextEdit, QPushButton, QGridLayout, QListWidget, QDialog, QLineEdit, QListWidgetItem, QLineEdit
-from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from PyQt5.QtCore import QObject, QRunnable, QSaveFile, QIODevice, QThreadPool, pyqtSignal, QTimer, Qt, QSortFilterProxyModel, QRegularExpression
+from PyQt5.QtGui import QStandardItemModel, QStandardItem, QTextCursor
+from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QTextEdit, QPushButton, QGridLayout, QListWidget, QListView, QAbstractItemView, QDialog, QLineEdit
 
 # --- Constants ---
 GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY")
+GEMINI_MODEL_NAME = 'models/gemini-1.5-flash-latest'
+# Matches only the four "<Section> Score: N" lines requested in the grading prompt, so an
+# "Overall Score: 8/16" summary isn't added on top of them. Leading list/heading markup and
+# bold markers around the label (e.g. "1. ", "## ", "**...:**") are allowed.
+_SCORE_RE = re.compile(r'^[\s*#>\-\d.]*(?:Requirements|Architecture|Components|Scalability) Score:\**\s*([0-4])\b', re.M)
+MAX_GRADE = 16
+# Maximum number of in-flight requests when grading all questions at once
+GRADE_ALL_CONCURRENCY = 10
 # Use absolute path for reliability
 APP_DIR = os.path.dirname(os.path.abspath(__file__))
 SOLUTIONS_FILE = os.path.join(APP_DIR, 'canonical_solutions.json')
 RESPONSES_FILE = os.path.join(APP_DIR, 'user_responses.json')
+GRADE_CACHE_FILE = os.path.join(APP_DIR, 'grade_cache.json')
+# Number of analyses kept in the grade cache; the least recently used ones are dropped first
+GRADE_CACHE_SIZE = 200
 GLOSSARY_FILE = os.path.join(APP_DIR, 'glossary.json')
 
 
 # --- Load Data ---
-with open(SOLUTIONS_FILE, 'r') as f:
-    CANONICAL_SOLUTIONS = json.load(f)
-
-with open(GLOSSARY_FILE, 'r') as f:
-    GLOSSARY_DATA = json.load(f)
+def _load_cached(path):
+    # Keep a pickled copy next to the JSON file, invalidated by the JSON file's mtime
+    cache_path = path + ".pkl"
+    mtime_ns = os.stat(path).st_mtime_ns
+    try:
+        with open(cache_path, 'rb') as f:
+            cached_mtime_ns, data = pickle.load(f)
+        if cached_mtime_ns == mtime_ns:
+            return data
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError):
+        pass
+
+    with open(path, 'rb') as f:
+        data = orjson.loads(f.read())
+    try:
+        with open(cache_path, 'wb') as f:
+            pickle.dump((mtime_ns, data), f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        pass  # Read-only install; just parse the JSON every time
+    return data
+
+def _normalize_newlines(text):
+    # QTextDocument stores "\r\n" as a single block separator; normalizing keeps
+    # Python string offsets in step with QTextCursor positions
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+def _dump_json(data):
+    return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+
+def _write_file(path, payload):
+    # QSaveFile writes to a temp file and only replaces `path` on commit(),
+    # so a crash mid-write never leaves truncated JSON behind
+    f = QSaveFile(path)
+    if not f.open(QIODevice.WriteOnly):
+        raise OSError(f.errorString())
+    f.write(payload)
+    if not f.commit():
+        raise OSError(f.errorString())
+
+def _write_json(path, data):
+    _write_file(path, _dump_json(data))
+
+CANONICAL_SOLUTIONS = _load_cached(SOLUTIONS_FILE)
+GLOSSARY_DATA = _load_cached(GLOSSARY_FILE)
 
 # --- Scoring Rubric ---
 SCORING_RUBRIC = """
@@ -53,54 +110,147 @@ SCORING_RUBRIC = """
 - 4 (Exceptional): A thorough analysis of scalability challenges with creative and effective solutions.
 """
 
-class GeminiWorker(QThread):
+SECTION_KEYS = ('requirements', 'architecture', 'components', 'scalability')
+
+# Analysis shown for an all-blank answer without calling Gemini; it parses to 0/16
+BLANK_ANALYSIS = """Requirements Score: 0
+Architecture Score: 0
+Components Score: 0
+Scalability Score: 0
+All sections blank."""
+
+def is_blank_solution(responses):
+    return not any(responses.get(key, '').strip() for key in SECTION_KEYS)
+
+def build_user_solution(responses):
+    return f"""
+    Requirement Analysis & Scoping:
+    {responses.get('requirements', '').strip() or '[USER LEFT THIS SECTION BLANK]'}
+
+    High-Level Architecture:
+    {responses.get('architecture', '').strip() or '[USER LEFT THIS SECTION BLANK]'}
+
+    Component Deep-Dive:
+    {responses.get('components', '').strip() or '[USER LEFT THIS SECTION BLANK]'}
+
+    Scalability & Bottleneck Analysis:
+    {responses.get('scalability', '').strip() or '[USER LEFT THIS SECTION BLANK]'}
+    """
+
+def grade_cache_key(question, user_solution, canonical_solution):
+    # The canonical solution is part of the key so editing canonical_solutions.json invalidates old grades
+    # (canonical solutions are dicts of section -> text, so serialize them deterministically)
+    canonical_bytes = orjson.dumps(canonical_solution, option=orjson.OPT_SORT_KEYS)
+    digest = hashlib.blake2b(question.encode() + b"\0" + user_solution.encode() + b"\0" + canonical_bytes, digest_size=16)
+    return digest.hexdigest()
+
+# The rubric and instructions never change, so only the two solutions are substituted per request.
+# SCORING_RUBRIC is concatenated in with its braces escaped so format_map only fills the two slots.
+_PROMPT_TEMPLATE = """
+    Analyze the following user solution for a system design problem.
+    Compare it against the provided canonical solution and score it based on the rubric.
+    If a section's content is '[USER LEFT THIS SECTION BLANK]', it means the user did not attempt it and it must be scored 0.
+
+    User Solution:
+    {user}
+
+    Canonical Solution:
+    {canon}
+
+    Scoring Rubric:
+    """ + SCORING_RUBRIC.replace("{", "{{").replace("}", "}}") + """
+
+    For each of the four sections, provide a score (0-4) and a brief, one-paragraph justification for that score. Return the output in the following format:
+    Requirements Score: [0-4] - [Justification]
+    Architecture Score: [0-4] - [Justification]
+    Components Score: [0-4] - [Justification]
+    Scalability Score: [0-4] - [Justification]
+
+    Finally, end with a 2-3 sentence summary of the overall score out of 16. Explain whether the user did a good job and how they would have performed in a real interview based on this answer.
+    """
+
+def build_prompt(user_solution, canonical_solution):
+    return _PROMPT_TEMPLATE.format_map({'user': user_solution, 'canon': canonical_solution})
+
+# Configured once and shared by every single-question grade request
+_MODEL = None
+
+def _get_model(api_key):
+    global _MODEL
+    if _MODEL is None:
+        genai.configure(api_key=api_key)
+        _MODEL = genai.GenerativeModel(GEMINI_MODEL_NAME)
+    return _MODEL
+
+class WorkerSignals(QObject):
+    chunk = pyqtSignal(str)
     finished = pyqtSignal(str)
     error = pyqtSignal(str)
 
+class GeminiRunnable(QRunnable):
     def __init__(self, api_key, user_solution, canonical_solution):
         super().__init__()
+        self.setAutoDelete(False)  # The app keeps a reference while grading
+        self.signals = WorkerSignals()
         self.api_key = api_key
         self.user_solution = user_solution
         self.canonical_solution = canonical_solution
-        self.prompt = f"""
-        Analyze the following user solution for a system design problem.
-        Compare it against the provided canonical solution and score it based on the rubric.
-        If a section's content is '[USER LEFT THIS SECTION BLANK]', it means the user did not attempt it and it must be scored 0.
-
-        User Solution:
-        {self.user_solution}
 
-        Canonical Solution:
-        {self.canonical_solution}
-
-        Scoring Rubric:
-        {SCORING_RUBRIC}
+    def _call_gemini_api(self, prompt):
+        model = _get_model(self.api_key)
+        # Stream so the user sees the analysis as it is generated instead of waiting on the full response
+        response = model.generate_content(prompt, stream=True, request_options={'timeout': 30})
+        for chunk in response:
+            # .text raises on chunks without parts (e.g. an empty final STOP chunk);
+            # real failures such as safety blocks surface from resolve()/.text below
+            if chunk.parts:
+                self.signals.chunk.emit(chunk.text)
+        response.resolve()
+        return response.text
 
-        For each of the four sections, provide a score (0-4) and a brief, one-paragraph justification for that score. Return the output in the following format:
-        Requirements Score: [0-4] - [Justification]
-        Architecture Score: [0-4] - [Justification]
-        Components Score: [0-4] - [Justification]
-        Scalability Score: [0-4] - [Justification]
+    def run(self):
+        try:
+            result = self._call_gemini_api(build_prompt(self.user_solution, self.canonical_solution))
+            self.signals.finished.emit(result)
+        except Exception as e:
+            self.signals.error.emit(str(e))
 
-        Finally, end with a 2-3 sentence summary of the overall score out of 16. Explain whether the user did a good job and how they would have performed in a real interview based on this answer.
-        """
+class BatchSignals(QObject):
+    result = pyqtSignal(str, str)  # question, analysis
+    error = pyqtSignal(str, str)   # question, error message
+    finished = pyqtSignal()
 
-    def _call_gemini_api(self):
+# Grades several questions concurrently on a single asyncio event loop
+class GeminiBatchRunnable(QRunnable):
+    def __init__(self, api_key, jobs):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.signals = BatchSignals()
+        self.api_key = api_key
+        self.jobs = jobs  # list of (question, prompt)
+
+    async def _grade_one(self, model, semaphore, question, prompt):
+        async with semaphore:
+            try:
+                response = await model.generate_content_async(prompt, request_options={'timeout': 10})
+                self.signals.result.emit(question, response.text)
+            except Exception as e:
+                self.signals.error.emit(question, str(e))
+
+    async def _grade_all_async(self):
+        # Not the shared _MODEL: its async client would stay bound to a previous batch's event loop
         genai.configure(api_key=self.api_key)
-        model = genai.GenerativeModel('models/gemini-1.5-flash-latest')
-        response = model.generate_content(self.prompt, request_options={'timeout': 10})
-        return response.text
+        model = genai.GenerativeModel(GEMINI_MODEL_NAME)
+        semaphore = asyncio.Semaphore(GRADE_ALL_CONCURRENCY)
+        await asyncio.gather(*(self._grade_one(model, semaphore, q, p) for q, p in self.jobs))
 
     def run(self):
-        executor = ThreadPoolExecutor(max_workers=1)
-        future = executor.submit(self._call_gemini_api)
         try:
-            result = future.result(timeout=6.5)
-            self.finished.emit(result)
-        except TimeoutError:
-            self.error.emit("Request timed out after 6 seconds.")
+            asyncio.run(self._grade_all_async())
         except Exception as e:
-            self.error.emit(str(e))
+            self.signals.error.emit("", str(e))
+        finally:
+            self.signals.finished.emit()
 
 class GlossaryDialog(QDialog):
     def __init__(self, parent=None):
@@ -115,8 +265,14 @@ class GlossaryDialog(QDialog):
         self.main_layout.addWidget(self.search_bar)
 
         self.content_layout = QHBoxLayout()
-        self.concept_list = QListWidget()
-        self.concept_list.currentItemChanged.connect(self.display_concept)
+        self.concept_model = QStandardItemModel(self)
+        self.concept_proxy = QSortFilterProxyModel(self)
+        self.concept_proxy.setSourceModel(self.concept_model)
+        self.concept_proxy.setFilterRole(Qt.UserRole)  # Match against the pre-lowered names
+        self.concept_list = QListView()
+        self.concept_list.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.concept_list.setModel(self.concept_proxy)
+        self.concept_list.selectionModel().currentChanged.connect(self.display_concept)
         self.content_layout.addWidget(self.concept_list)
 
         self.concept_display = QTextEdit()
@@ -128,50 +284,53 @@ class GlossaryDialog(QDialog):
         self.load_concepts()
 
     def load_concepts(self):
+        self._row_to_section = {}  # Source-model row of each concept -> its section name
         for section, concepts in GLOSSARY_DATA.items():
-            section_item = QListWidgetItem(f"--- {section} ---")
+            section_item = QStandardItem(f"--- {section} ---")
             font = section_item.font()
             font.setBold(True)
             section_item.setFont(font)
             section_item.setFlags(section_item.flags() & ~Qt.ItemIsSelectable)
-            self.concept_list.addItem(section_item)
+            section_item.setData("---", Qt.UserRole)
+            self.concept_model.appendRow(section_item)
             for concept in concepts.keys():
-                self.concept_list.addItem(concept)
+                concept_item = QStandardItem(concept)
+                concept_item.setData(concept.lower(), Qt.UserRole)
+                self._row_to_section[self.concept_model.rowCount()] = section
+                self.concept_model.appendRow(concept_item)
 
     def filter_concepts(self, text):
-        for i in range(self.concept_list.count()):
-            item = self.concept_list.item(i)
-            is_section = item.text().startswith('---')
-            if is_section:
-                item.setHidden(False) # Always show sections
-            else:
-                item.setHidden(text.lower() not in item.text().lower())
+        # The "^---" branch keeps section headers visible, so the whole filter runs inside Qt.
+        # Names were lowercased once in load_concepts, so a case-sensitive match is enough.
+        lowered = text.lower()
+        pattern = QRegularExpression(f"^---|{QRegularExpression.escape(lowered)}")
+        self.concept_proxy.setFilterRegularExpression(pattern)
 
     def display_concept(self, current, previous):
-        if current is not None and not current.text().startswith('---'):
-            section_item = self.find_section_item(current)
-            if section_item:
-                section = section_item.text().strip('--- ')
-                concept = current.text()
+        if current.isValid():
+            row = self.concept_proxy.mapToSource(current).row()
+            section = self._row_to_section.get(row)
+            if section is not None:
+                concept = self.concept_model.item(row).text()
                 self.concept_display.setText(GLOSSARY_DATA[section][concept])
-        else:
-            self.concept_display.clear()
-
-    def find_section_item(self, item):
-        index = self.concept_list.row(item)
-        while index >= 0:
-            current_item = self.concept_list.item(index)
-            if current_item.text().startswith('---'):
-                return current_item
-            index -= 1
-        return None
+                return
+        self.concept_display.clear()
 
 class SystemDesignApp(QWidget):
     def __init__(self):
         super().__init__()
         self.questions = list(CANONICAL_SOLUTIONS.keys())
         self.user_responses = self.load_or_create_responses()
+        self._grade_cache = self.load_grade_cache()
         self.worker = None
+        self.batch_worker = None
+        self._batch_cache_keys = {}  # question -> grade cache key for the running Grade All batch
+        self._batch_running = False
+        self._glossary_dialog = None
+        self._last_output = ""  # Plain text currently shown in analysis_output
+        self._dirty = False
+        self._last_written_hash = None
+        self.init_save_writer()
         self.initUI()
         self.init_autosave_timer()
         # Load the first question's content
@@ -221,24 +380,66 @@ class SystemDesignApp(QWidget):
         self.grid_layout.addWidget(self.components_input, 2, 1)
         self.grid_layout.addWidget(QLabel('Scalability & Bottleneck Analysis:'), 3, 0)
         self.grid_layout.addWidget(self.scalability_input, 3, 1)
+        for text_input in (self.requirements_input, self.architecture_input, self.components_input, self.scalability_input):
+            text_input.textChanged.connect(self.mark_dirty)
         self.right_layout.addLayout(self.grid_layout)
 
         # Analyze Button
         self.analyze_button = QPushButton('Grade Solution')
         self.analyze_button.clicked.connect(self.start_analysis)
-        self.right_layout.addWidget(self.analyze_button)
+        self.grade_all_button = QPushButton('Grade All Ungraded')
+        self.grade_all_button.clicked.connect(self.grade_all)
+        self.button_layout = QHBoxLayout()
+        self.button_layout.addWidget(self.analyze_button)
+        self.button_layout.addWidget(self.grade_all_button)
+        self.right_layout.addLayout(self.button_layout)
 
         # Result Display
         self.analysis_output = QTextEdit()
         self.analysis_output.setReadOnly(True)
+        # Output is edited through QTextCursor; don't keep an undo history nobody can use
+        self.analysis_output.setUndoRedoEnabled(False)
         self.right_layout.addWidget(self.analysis_output)
 
         self.main_layout.addLayout(self.right_layout, 3)
         self.setLayout(self.main_layout)
 
     def open_glossary(self):
-        dialog = GlossaryDialog(self)
-        dialog.exec_()
+        # Built once and kept around; later opens just re-show it without blocking the main window
+        if self._glossary_dialog is None:
+            self._glossary_dialog = GlossaryDialog(self)
+        self._glossary_dialog.show()
+        self._glossary_dialog.raise_()
+        self._glossary_dialog.activateWindow()
+
+    def init_save_writer(self):
+        # Response files are written on a background thread so slow or cloud-synced disks don't stall the UI.
+        # At most one snapshot is pending at a time; a newer save replaces one that hasn't been written yet.
+        self._save_queue = queue.Queue(maxsize=1)
+        self._save_thread = threading.Thread(target=self._save_worker, daemon=True)
+        self._save_thread.start()
+
+    def _save_worker(self):
+        while True:
+            payload = self._save_queue.get()
+            try:
+                _write_file(RESPONSES_FILE, payload)
+            except OSError as e:
+                print(f"Failed to save responses: {e}", file=sys.stderr)
+                # Forget the queued hash and stay dirty so the next autosave (or closeEvent) retries
+                self._last_written_hash = None
+                self._dirty = True
+            finally:
+                self._save_queue.task_done()
+
+    def queue_save(self, payload):
+        try:
+            self._save_queue.get_nowait()
+            self._save_queue.task_done()
+        except queue.Empty:
+            pass
+        # The GUI thread is the only producer, so the slot is free now
+        self._save_queue.put_nowait(payload)
 
     def init_autosave_timer(self):
         self.autosave_timer = QTimer(self)
@@ -247,39 +448,81 @@ class SystemDesignApp(QWidget):
 
     def load_or_create_responses(self):
         try:
-            with open(RESPONSES_FILE, 'r') as f:
-                responses = json.load(f)
+            with open(RESPONSES_FILE, 'rb') as f:
+                responses = orjson.loads(f.read())
                 # Ensure all questions exist in the file and have a grade
                 for q in self.questions:
                     if q not in responses:
-                        responses[q] = {"requirements": "", "architecture": "", "components": "", "scalability": "", "current_grade": 0}
-                    elif "current_grade" not in responses[q]:
-                        responses[q]["current_grade"] = 0
+                        responses[q] = {"requirements": "", "architecture": "", "components": "", "scalability": "", "current_grade": 0, "graded": False}
+                    else:
+                        if "current_grade" not in responses[q]:
+                            responses[q]["current_grade"] = 0
+                        if "graded" not in responses[q]:
+                            # Older files have no flag; a non-zero grade is the only evidence of grading
+                            responses[q]["graded"] = responses[q]["current_grade"] > 0
                 return responses
-        except (FileNotFoundError, json.JSONDecodeError):
-            responses = {q: {"requirements": "", "architecture": "", "components": "", "scalability": "", "current_grade": 0} for q in self.questions}
-            with open(RESPONSES_FILE, 'w') as f:
-                json.dump(responses, f, indent=2)
+        except (FileNotFoundError, orjson.JSONDecodeError):
+            responses = {q: {"requirements": "", "architecture": "", "components": "", "scalability": "", "current_grade": 0, "graded": False} for q in self.questions}
+            _write_json(RESPONSES_FILE, responses)
             return responses
 
+    def load_grade_cache(self):
+        try:
+            with open(GRADE_CACHE_FILE, 'rb') as f:
+                return orjson.loads(f.read())
+        except (FileNotFoundError, orjson.JSONDecodeError):
+            return {}
+
+    def save_grade_cache(self):
+        # Persisting is best effort; the in-memory cache still works on a read-only install
+        try:
+            _write_json(GRADE_CACHE_FILE, self._grade_cache)
+        except OSError as e:
+            print(f"Failed to save grade cache: {e}", file=sys.stderr)
+
+    def get_cached_grade(self, cache_key):
+        analysis_result = self._grade_cache.pop(cache_key, None)
+        if analysis_result is not None:
+            self._grade_cache[cache_key] = analysis_result  # Move to the most recently used end
+        return analysis_result
+
+    def cache_grade(self, cache_key, analysis_result):
+        self._grade_cache.pop(cache_key, None)
+        self._grade_cache[cache_key] = analysis_result
+        while len(self._grade_cache) > GRADE_CACHE_SIZE:
+            del self._grade_cache[next(iter(self._grade_cache))]
+        self.save_grade_cache()
+
+    def mark_dirty(self):
+        self._dirty = True
+
     def save_current_responses(self, item=None):
         if item is None:
+            # Autosave is a no-op until something has actually changed
+            if not self._dirty:
+                return
             item = self.question_list.currentItem()
 
         if not item:
             return
 
         question_text = item.text()
-        grade = self.user_responses.get(question_text, {}).get("current_grade", 0)
+        previous = self.user_responses.get(question_text, {})
         self.user_responses[question_text] = {
             "requirements": self.requirements_input.toPlainText(),
             "architecture": self.architecture_input.toPlainText(),
             "components": self.components_input.toPlainText(),
             "scalability": self.scalability_input.toPlainText(),
-            "current_grade": grade
+            "current_grade": previous.get("current_grade", 0),
+            "graded": previous.get("graded", False)
         }
-        with open(RESPONSES_FILE, 'w') as f:
-            json.dump(self.user_responses, f, indent=2)
+        payload = _dump_json(self.user_responses)
+        payload_hash = hashlib.blake2b(payload, digest_size=16).digest()
+        # Update the bookkeeping before handing off, so a failed write can reset it from the writer thread
+        self._dirty = False
+        if payload_hash != self._last_written_hash:
+            self._last_written_hash = payload_hash
+            self.queue_save(payload)
 
     def question_changed(self, current, previous):
         # Save the responses for the question we are leaving
@@ -291,77 +534,191 @@ class SystemDesignApp(QWidget):
             question_text = current.text()
             self.question_label.setText(question_text)
             self.load_responses_for_question(question_text)
-            self.analysis_output.clear()
+            if not self._batch_running:  # Keep the Grade All progress log visible
+                self.set_analysis_output("")
             grade = self.user_responses.get(question_text, {}).get("current_grade", 0)
             self.grade_label.setText(f"Current Grade: {grade}/16")
 
     def load_responses_for_question(self, question):
         responses = self.user_responses.get(question, {})
-        self.requirements_input.setText(responses.get("requirements", ""))
-        self.architecture_input.setText(responses.get("architecture", ""))
-        self.components_input.setText(responses.get("components", ""))
-        self.scalability_input.setText(responses.get("scalability", ""))
+        text_inputs = (self.requirements_input, self.architecture_input, self.components_input, self.scalability_input)
+        for text_input, key in zip(text_inputs, SECTION_KEYS):
+            # Loading saved text isn't an edit, so keep textChanged from marking the state dirty
+            text_input.blockSignals(True)
+            text_input.setPlainText(responses.get(key, ""))
+            text_input.blockSignals(False)
 
     def start_analysis(self):
         self.analyze_button.setEnabled(False)
         self.analyze_button.setText("Grading...")
+        self.grade_all_button.setEnabled(False)
         self.save_current_responses()
 
         current_question = self.question_list.currentItem().text()
         responses = self.user_responses.get(current_question, {})
-        
-        user_solution = f"""
-        Requirement Analysis & Scoping:
-        {responses.get('requirements', '').strip() or '[USER LEFT THIS SECTION BLANK]'}
+        if is_blank_solution(responses):
+            self.display_scores(current_question, BLANK_ANALYSIS)
+            return
+        user_solution = build_user_solution(responses)
 
-        High-Level Architecture:
-        {responses.get('architecture', '').strip() or '[USER LEFT THIS SECTION BLANK]'}
+        canonical_solution = CANONICAL_SOLUTIONS.get(current_question, "")
 
-        Component Deep-Dive:
-        {responses.get('components', '').strip() or '[USER LEFT THIS SECTION BLANK]'}
+        # Re-grading an unchanged answer reuses the previous analysis
+        cache_key = grade_cache_key(current_question, user_solution, canonical_solution)
+        cached_result = self.get_cached_grade(cache_key)
+        if cached_result is not None:
+            self.display_scores(current_question, cached_result)
+            return
 
-        Scalability & Bottleneck Analysis:
-        {responses.get('scalability', '').strip() or '[USER LEFT THIS SECTION BLANK]'}
-        """
+        self.set_analysis_output("")
+        self.worker = GeminiRunnable(GEMINI_API_KEY, user_solution, canonical_solution)
+        # The question is bound into each slot so switching questions mid-stream
+        # can't redirect chunks or the grade to whichever question is now selected
+        self.worker.signals.chunk.connect(partial(self.append_question_chunk, current_question))
+        self.worker.signals.finished.connect(partial(self.cache_and_display_scores, cache_key, current_question))
+        self.worker.signals.error.connect(partial(self.display_error, current_question))
+        QThreadPool.globalInstance().start(self.worker)
+
+    def set_analysis_output(self, text):
+        # Only replace what follows the prefix shared with the text already shown,
+        # so re-displaying a mostly identical analysis doesn't relayout the whole document
+        text = _normalize_newlines(text)
+        old_text = self._last_output
+        prefix_len = len(os.path.commonprefix([old_text, text]))
+        cursor = QTextCursor(self.analysis_output.document())
+        # QTextCursor positions count UTF-16 code units, not Python characters
+        cursor.setPosition(len(old_text[:prefix_len].encode('utf-16-le')) // 2)
+        cursor.movePosition(QTextCursor.End, QTextCursor.KeepAnchor)
+        cursor.insertText(text[prefix_len:])
+        self._last_output = text
+
+    def append_analysis_chunk(self, text):
+        text = _normalize_newlines(text)
+        cursor = QTextCursor(self.analysis_output.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(text)
+        self._last_output += text
+
+    def append_question_chunk(self, question, text):
+        if self.is_current_question(question):
+            self.append_analysis_chunk(text)
+
+    def is_current_question(self, question):
+        current_item = self.question_list.currentItem()
+        return current_item is not None and current_item.text() == question
+
+    def append_analysis_line(self, line):
+        self.append_analysis_chunk("\n" + line if self._last_output else line)
+
+    def grade_all(self):
+        self.save_current_responses()
 
-        canonical_solution = CANONICAL_SOLUTIONS.get(current_question, "")
-        self.worker = GeminiWorker(GEMINI_API_KEY, user_solution, canonical_solution)
-        self.worker.finished.connect(self.display_scores)
-        self.worker.error.connect(self.display_error)
-        self.worker.start()
+        jobs = []
+        cached_results = []
+        self._batch_cache_keys = {}
+        for question in self.questions:
+            responses = self.user_responses.get(question, {})
+            # Blank answers would only come back as 0/16, so don't spend a request on them
+            if responses.get("graded", False) or is_blank_solution(responses):
+                continue
+            user_solution = build_user_solution(responses)
+            canonical_solution = CANONICAL_SOLUTIONS.get(question, "")
+            cache_key = grade_cache_key(question, user_solution, canonical_solution)
+            cached_result = self.get_cached_grade(cache_key)
+            if cached_result is not None:
+                cached_results.append((question, cached_result))
+                continue
+            jobs.append((question, build_prompt(user_solution, canonical_solution)))
+            self._batch_cache_keys[question] = cache_key
+
+        if not jobs and not cached_results:
+            self.set_analysis_output("Every answered question already has a grade.")
+            return
+
+        self.set_analysis_output(f"Grading {len(jobs) + len(cached_results)} questions...")
+        for question, cached_result in cached_results:
+            self.record_batch_score(question, cached_result)
+        if not jobs:
+            self.append_analysis_line("Done.")
+            return
+
+        self.analyze_button.setEnabled(False)
+        self.grade_all_button.setEnabled(False)
+        self.grade_all_button.setText(f"Grading {len(jobs)}...")
+        self._batch_running = True
 
-    def display_scores(self, analysis_result):
-        self.analysis_output.setText(analysis_result)
+        self.batch_worker = GeminiBatchRunnable(GEMINI_API_KEY, jobs)
+        self.batch_worker.signals.result.connect(self.display_batch_score)
+        self.batch_worker.signals.error.connect(self.display_batch_error)
+        self.batch_worker.signals.finished.connect(self.batch_finished)
+        QThreadPool.globalInstance().start(self.batch_worker)
+
+    def display_batch_score(self, question, analysis_result):
+        self.cache_grade(self._batch_cache_keys[question], analysis_result)
+        self.record_batch_score(question, analysis_result)
+
+    def record_batch_score(self, question, analysis_result):
+        total_score = self.parse_and_update_grade(analysis_result)
+        self.user_responses[question]["current_grade"] = total_score
+        self.user_responses[question]["graded"] = True
+        self._dirty = True
+        self.save_current_responses()
+        self.append_analysis_line(f"{question}: {total_score}/16")
+
+        if self.is_current_question(question):
+            self.grade_label.setText(f"Current Grade: {total_score}/16")
+
+    def display_batch_error(self, question, error_message):
+        if question:
+            self.append_analysis_line(f"{question}: an error occurred: {error_message}")
+        else:
+            self.append_analysis_line(f"An error occurred: {error_message}")
+
+    def batch_finished(self):
+        self._batch_running = False
+        self.append_analysis_line("Done.")
+        self.analyze_button.setEnabled(True)
+        self.grade_all_button.setEnabled(True)
+        self.grade_all_button.setText("Grade All Ungraded")
+
+    def cache_and_display_scores(self, cache_key, question, analysis_result):
+        self.cache_grade(cache_key, analysis_result)
+        self.display_scores(question, analysis_result)
+
+    def display_scores(self, question, analysis_result):
         self.analyze_button.setEnabled(True)
         self.analyze_button.setText("Grade Solution")
+        self.grade_all_button.setEnabled(True)
 
-        # Parse the score and update the grade
+        # Parse the score and update the grade of the question that was graded
         total_score = self.parse_and_update_grade(analysis_result)
-        current_question = self.question_list.currentItem().text()
-        self.user_responses[current_question]["current_grade"] = total_score
+        self.user_responses[question]["current_grade"] = total_score
+        self.user_responses[question]["graded"] = True
+        self._dirty = True
         self.save_current_responses()  # Save immediately after grading
-        self.grade_label.setText(f"Current Grade: {total_score}/16")
+        if self.is_current_question(question):
+            self.set_analysis_output(analysis_result)
+            self.grade_label.setText(f"Current Grade: {total_score}/16")
 
     def parse_and_update_grade(self, analysis_result):
-        total_score = 0
-        try:
-            lines = analysis_result.strip().split('\n')
-            for line in lines:
-                if ":" in line:
-                    score_str = line.split(':')[1].strip().split(' ')[0]
-                    total_score += int(score_str)
-        except (ValueError, IndexError):
-            # Handle cases where parsing fails
-            pass
-        return total_score
+        return min(sum(map(int, _SCORE_RE.findall(analysis_result))), MAX_GRADE)
 
-    def display_error(self, error_message):
-        self.analysis_output.setText(f"An error occurred: {error_message}")
+    def display_error(self, question, error_message):
+        if self.is_current_question(question):
+            self.set_analysis_output(f"An error occurred: {error_message}")
+        else:
+            self.set_analysis_output(f"Grading \"{question}\" failed: {error_message}")
         self.analyze_button.setEnabled(True)
         self.analyze_button.setText("Grade Solution")
+        self.grade_all_button.setEnabled(True)
 
     def closeEvent(self, event):
         self.save_current_responses()
+        self._save_queue.join()  # Don't exit with a write still pending
+        if self._dirty:
+            # The last write failed; give it one more try before exiting
+            self.save_current_responses()
+            self._save_queue.join()
         super().closeEvent(event)
 
 # --- Dark Mode Stylesheet ---
@@ -401,16 +758,16 @@ DARK_STYLE = """
     QPushButton:pressed {
         background-color: #6A6A6A;
     }
-    QListWidget {
+    QListWidget, QListView {
         background-color: #3C3C3C;
         color: #F0F0F0;
         border: 1px solid #555555;
         border-radius: 3px;
     }
-    QListWidget::item {
+    QListWidget::item, QListView::item {
         padding: 5px;
     }
-    QListWidget::item:selected {
+    QListWidget::item:selected, QListView::item:selected {
         background-color: #4A90E2;
         color: #FFFFFF;
     }